@@ -12,32 +12,32 @@ def check_now():
     
     print(f"\n🔎 스캐너 눈 검사 중... (대상: {test_symbols})")
     print("="*80)
-    print(f"{'Jongmok':<10} | {'Current':<10} | {'Base(Prev)':<10} | {'Open':<10} | {'Gap(%)':<10} | {'Real(%)':<10}")
+    print(f"{'Jongmok':<10} | {'Current':<10} | {'Base(Prev)':<10} | {'Real(%)':<10}")
     print("-" * 80)
-    
+
+    # [수정] 종목마다 현재가를 따로 조회하지 않고, 스캐너와 같은 랭킹 응답 1회로 일괄 확인
+    watchlist = set(test_symbols)
+    rows = {}
+    for item in kis.get_ranking() or []:
+        sym = item.get('symb')
+        if sym in watchlist and sym not in rows:
+            rows[sym] = item
+
     for sym in test_symbols:
         try:
-            data = kis.get_current_price("NASD", sym)
-            if not data:
-                print(f"{sym:<10} | 데이터 수신 실패 (장 운영 시간 확인)")
+            item = rows.get(sym)
+            if not item:
+                print(f"{sym:<10} | 랭킹 미포함 (급등률 상위 목록에 없음 / 장 운영 시간 확인)")
                 continue
-                
-            curr = float(data.get('last', 0))
-            base = float(data.get('base', 0))  # 전일 종가
-            open_p = float(data.get('open', 0)) # 당일 시가
-            
-            # 1. 봇이 기존에 보던 시각 (시가 대비)
-            bot_view = 0.0
-            if open_p > 0:
-                bot_view = (curr - open_p) / open_p * 100
-            
-            # 2. 사용자(HTS)가 보는 시각 (전일 대비)
-            human_view = 0.0
-            if base > 0:
-                human_view = (curr - base) / base * 100
-                
-            print(f"{sym:<10} | ${curr:<9.2f} | ${base:<9.2f} | ${open_p:<9.2f} | {bot_view:6.2f}%    | {human_view:6.2f}% (HTS)")
-            
+
+            curr = float(item.get('last') or 0)
+            rate = float(item.get('rate') or 0)  # 전일 대비 등락률 (HTS 기준)
+
+            # 전일 종가 역산 (스캐너의 '출신 성분' 필터와 동일한 기준)
+            base = curr / (1 + rate / 100.0) if rate > -99.0 else 0.0
+
+            print(f"{sym:<10} | ${curr:<9.2f} | ${base:<9.2f} | {rate:6.2f}% (HTS)")
+
         except Exception as e:
             print(f"{sym} 에러: {e}")
 
@@ -59,6 +59,11 @@ class Config:
 
     # === [KIS API] ===
     BASE_URL = "https://openapi.koreainvestment.com:9443"
+    API_CALLS_PER_SEC = 13            # KIS 조회 호출 속도 (재시도 재전송 포함, 모의투자는 0.55초 간격 고정)
+    API_CALLS_BURST = 1               # 조회 순간 추가 허용 건수 (초당 최대 = 13 + 1 = 14건)
+    API_ORDER_CALLS_PER_SEC = 2       # 주문/취소 전용 호출 몫 (실전 한도 20건 - 조회 14건 = 남은 6건 중 여유 2건 제외)
+    API_ORDER_CALLS_BURST = 2         # 주문 순간 추가 허용 건수 (거래소 폴백 3회를 대기 없이 전송, 초당 최대 2 + 2 = 4건 -> 조회와 합쳐 18건)
+    API_FETCH_WORKERS = 4             # 분봉/현재가 동시 조회 스레드 수 (모의투자는 호출 제한 때문에 항상 1)
 
     # ==========================================
     # 🔍 [스캐닝 설정]
@@ -71,6 +76,7 @@ class Config:
     FILTER_MAX_PRICE = 50.0         # 최대 주가 $50.0 (너무 비싼 주식 제외)
     # 💡 새벽 4시(프리마켓 초기)에는 거래량이 적으므로, 이 기준에 못 미쳐 종목이 안 잡힐 수 있습니다.
     FILTER_MIN_TX_VALUE = 50000   # 최소 거래대금 $50,000 (약 7천만원)
+    SCAN_MAX_CANDIDATES = 0         # 1회 스캔당 최대 후보 수 (급등률 상위 순, 0 = 제한 없음 / 양수로 설정 시 초과 급등주는 후보에서 제외됨)
     
     # [SPAC 및 악성 종목 필터링 키워드 DB]
     # ASPC 등 "ACQUISITION"이 들어간 종목을 원천 차단합니다.
@@ -1,10 +1,23 @@
 # data/market_listener.py
 import logging
 import os
+import re
 import datetime
 from infra.utils import get_logger
 from config import Config
 
+# SPAC/워런트/유닛/권리/우선주 접미사 (5글자 이상 티커의 마지막 글자)
+_BAD_SUFFIX = frozenset('UWRQP')
+
+def _to_float(val, default=0.0):
+    """랭킹 필드 숫자 변환 (빈 값은 예외 없이 바로 기본값 반환)"""
+    if val in ('', None):
+        return default
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return default
+
 class MarketListener:
     def __init__(self, kis_api):
         self.kis = kis_api
@@ -32,11 +45,20 @@ class MarketListener:
         self.last_scan_date = None
         self.detected_candidate_meta = {}
 
+        # ✅ [NEW] 금지어 필터를 정규식 하나로 미리 컴파일 (종목마다 키워드 리스트 순회 X)
+        keywords = getattr(Config, 'BLACKLIST_KEYWORDS', [])
+        self._blacklist_re = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+
+    def _is_garbage(self, name):
+        """종목명(대문자)에 금지어(SPAC/워런트/펀드 등)가 포함되어 있는지 검사"""
+        return self._blacklist_re is not None and self._blacklist_re.search(name) is not None
+
     def scan_markets(self, ban_list=None, active_candidates=None):
         """
-        [실시간 급등주 검색 v5.5 - Debug Edition]
+        [실시간 급등주 검색 v5.6 - Debug Edition]
         - 탈락 사유(Filter Reject)를 별도 로그파일에 기록
         - 급등률(Threshold)을 만족했으나 필터에 걸린 '아까운 종목'만 기록
+        - [v5.6] 필터 순서 재배치: 급등률 → 숫자 필터 → 문자열(키워드) 필터 (싼 검사부터)
         """
         if ban_list is None: ban_list = set()
         if active_candidates is None: active_candidates = set()
@@ -48,7 +70,7 @@ class MarketListener:
             self.detected_candidate_meta.clear()
             self.last_scan_date = today_str
 
-        detected_stocks = []
+        detected_stocks = {} # 순서 보존 중복 제거 (랭킹 순서 = 급등 순서 유지)
         
         # 1. Config 로드
         THRESHOLD = getattr(Config, 'MIN_CHANGE_PCT', 42.0)
@@ -56,94 +78,101 @@ class MarketListener:
         MIN_P = getattr(Config, 'FILTER_MIN_PRICE', 0.5)
         MAX_P = getattr(Config, 'FILTER_MAX_PRICE', 50.0)
         MIN_VAL = getattr(Config, 'FILTER_MIN_TX_VALUE', 50000)
-        BLACKLIST = getattr(Config, 'BLACKLIST_KEYWORDS', [])
+        MAX_PICKS = getattr(Config, 'SCAN_MAX_CANDIDATES', 0)
 
         try:
-            rank_data = self.kis.get_ranking()
+            # [NEW] 등락률 내림차순 정렬이 보장된 응답이면, 미달 종목 이후는 볼 필요 없음
+            # [수정] 정렬 여부는 같은 응답과 함께 받아 사용 (다른 랭킹 호출이 덮어쓸 수 없음)
+            ranking = self.kis.get_ranking_with_order()
+            if not ranking: return []
+            rank_data, rank_sorted = ranking
             if not rank_data: return []
 
             for item in rank_data:
                 sym = item.get('symb')
                 if sym in ban_list: continue # 밴 종목은 조용히 스킵
 
-                name = item.get('name', '').upper()
-                
-                try:
-                    rate = float(item.get('rate', 0))
-                    price = float(item.get('last') or item.get('price') or item.get('stck_prpr') or 0)
-                    vol = float(item.get('tvol') or item.get('volume') or item.get('avol') or item.get('acml_vol') or 0)
-                except (ValueError, TypeError):
-                    continue 
+                rate = _to_float(item.get('rate'), None)
+                if rate is None: continue # 등락률 누락 행은 정렬 판단에 쓰지 않고 스킵
 
                 # =========================================================
-                # 🔍 [Smart Logging] 잠재적 후보군 집중 감시
+                # ⚡ [Fast Reject] 급등률 미달 종목은 가장 먼저 탈락
                 # =========================================================
-                # 급등률 조건은 만족했으나, 다른 필터에서 떨어질 놈들을 추적
-                is_potential_candidate = (rate >= THRESHOLD)
-
-                # 1. SPAC/접미사 필터
-                if len(sym) >= 5 and sym[-1] in ['U', 'W', 'R', 'Q', 'P']:
-                    if is_potential_candidate:
-                        self.debug_logger.debug(f"🚫 [FILTER:Suffix] {sym} (+{rate}%) - SPAC/Warrant 제외")
-                    continue
-                
-                # 2. 키워드 필터
-                if any(k in name for k in BLACKLIST):
-                    if is_potential_candidate:
-                        self.debug_logger.debug(f"🚫 [FILTER:Keyword] {sym} ({name}) - 금지어 포함")
+                # 랭킹 응답의 대부분은 THRESHOLD 미달이므로, 가격/거래량 파싱 전에 걸러냅니다.
+                # (이 아래부터는 모두 '잠재적 후보군'이므로 탈락 사유를 디버그 로그에 기록)
+                if rate < THRESHOLD:
+                    if rank_sorted:
+                        break # 이후 종목은 모두 이보다 등락률이 낮음
                     continue
 
-                # 3. 과열(Max Threshold) 필터
+                # 1. 과열(Max Threshold) 필터
                 if rate > MAX_THRESHOLD:
-                    if is_potential_candidate:
-                        self.debug_logger.debug(f"🚫 [FILTER:Overheat] {sym} (+{rate}%) - 과열(>{MAX_THRESHOLD}%) 제외")
+                    self.debug_logger.debug(f"🚫 [FILTER:Overheat] {sym} (+{rate}%) - 과열(>{MAX_THRESHOLD}%) 제외")
+                    continue
+
+                # 2. SPAC/접미사 필터
+                if len(sym) >= 5 and sym[-1] in _BAD_SUFFIX:
+                    self.debug_logger.debug(f"🚫 [FILTER:Suffix] {sym} (+{rate}%) - SPAC/Warrant 제외")
                     continue
 
-                # 4. 가격(Price) 필터
+                price = _to_float(item.get('last') or item.get('price') or item.get('stck_prpr'))
+
+                # 3. 가격(Price) 필터
                 if not (MIN_P <= price <= MAX_P):
-                    if is_potential_candidate:
-                        self.debug_logger.debug(f"🚫 [FILTER:Price] {sym} (${price}) - 가격 범위({MIN_P}~{MAX_P}) 이탈")
+                    self.debug_logger.debug(f"🚫 [FILTER:Price] {sym} (${price}) - 가격 범위({MIN_P}~{MAX_P}) 이탈")
                     continue
-                
-                # 전일 종가 계산 (출신 성분)
-                prev_close = price / (1 + (rate / 100.0)) if rate > -99.0 else 0.0
-                if prev_close < MIN_P:
-                    if is_potential_candidate:
-                         self.debug_logger.debug(f"🚫 [FILTER:Penny] {sym} (Prev ${prev_close:.2f}) - 동전주 출신 제외")
-                    continue 
-                
-                # 5. 거래대금(Value) 필터
+
+                # 거래량은 가격 필터 통과 종목만 파싱
+                vol = _to_float(item.get('tvol') or item.get('volume') or item.get('avol') or item.get('acml_vol'))
+
+                # 4. 거래대금(Value) 필터
                 trade_value = price * vol
                 if trade_value < MIN_VAL:
-                    if is_potential_candidate:
-                         self.debug_logger.debug(f"🚫 [FILTER:Value] {sym} (${trade_value:,.0f}) - 거래대금 부족(<{MIN_VAL})")
+                    self.debug_logger.debug(f"🚫 [FILTER:Value] {sym} (${trade_value:,.0f}) - 거래대금 부족(<{MIN_VAL})")
+                    continue
+
+                # 5. 전일 종가 필터 (출신 성분)
+                # prev_close = price / (1 + rate/100) >= MIN_P  ⟺  price >= MIN_P * (1 + rate/100)
+                # 나눗셈 대신 곱셈 비교로 판정 (rate는 이미 THRESHOLD 이상이므로 분모는 항상 양수)
+                if price < MIN_P * (1.0 + rate * 0.01):
+                    prev_close = price / (1.0 + rate * 0.01)
+                    self.debug_logger.debug(f"🚫 [FILTER:Penny] {sym} (Prev ${prev_close:.2f}) - 동전주 출신 제외")
+                    continue
+
+                # 6. 키워드 필터 (문자열 검사 - 가장 비싸므로 생존 종목에만 수행)
+                name = item.get('name', '').upper()
+                if self._is_garbage(name):
+                    self.debug_logger.debug(f"🚫 [FILTER:Keyword] {sym} ({name}) - 금지어 포함")
                     continue
 
                 # =========================================================
                 # ✅ 최종 선정 (All Pass)
                 # =========================================================
-                if rate >= THRESHOLD:
-                    self.detected_candidate_meta[sym] = {
-                        'exchange': item.get('_excd', ''),
-                        'name': name,
-                        'rate': rate,
-                        'detected_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    # ✅ [FIX] 오늘 이미 알림을 보낸 종목은 콘솔 로그 출력 생략
-                    if sym not in active_candidates and sym not in self.notified_stocks:
-                        self.logger.info(
-                            f"🚨 [급등 포착] {sym} ({name}) (+{rate}%) "
-                            f"| Price ${price} "
-                            f"| Val ${trade_value/1000:,.0f}k"
-                        )
-                        self.notified_stocks.add(sym) # 알림을 보냈다고 도장 쾅
-                    
-                    detected_stocks.append(sym)
+                self.detected_candidate_meta[sym] = {
+                    'exchange': item.get('_excd', ''),
+                    'name': name,
+                    'rate': rate,
+                    'detected_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }
+                # ✅ [FIX] 오늘 이미 알림을 보낸 종목은 콘솔 로그 출력 생략
+                if sym not in active_candidates and sym not in self.notified_stocks:
+                    self.logger.info(
+                        f"🚨 [급등 포착] {sym} ({name}) (+{rate}%) "
+                        f"| Price ${price} "
+                        f"| Val ${trade_value/1000:,.0f}k"
+                    )
+                    self.notified_stocks.add(sym) # 알림을 보냈다고 도장 쾅
+
+                detected_stocks[sym] = None
+
+                # [NEW] 상위 급등 순으로 충분한 후보를 확보하면 나머지 피드는 스캔 생략
+                if MAX_PICKS and len(detected_stocks) >= MAX_PICKS:
+                    break
 
         except Exception as e:
             self.logger.debug(f"Scanner Loop Warning: {e}")
 
-        return list(set(detected_stocks))
+        return list(detected_stocks)
 
     def get_candidate_exchange(self, ticker):
         meta = self.detected_candidate_meta.get(ticker, {})
@@ -5,6 +5,8 @@ import requests
 import json
 import pandas as pd
 import time
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
@@ -16,7 +18,55 @@ root_dir = os.path.dirname(current_dir)
 sys.path.append(root_dir)                                
 
 from config import Config
-from infra.utils import get_logger, log_api_call
+from infra.utils import get_logger, log_api_call, TTLCache, TokenBucket
+
+# [선택] orjson이 설치되어 있으면 JSON 파싱/직렬화를 C 구현으로 대체 (없으면 표준 json 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(raw):
+    """응답 본문(bytes) -> dict (orjson 우선, 실패 시 ValueError 계열 예외)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps(obj):
+    """요청 본문 dict -> bytes (requests의 json= 내부 직렬화 대체)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+# 거래소 코드 변환표 (주문용 → 시세 조회용 / 시세 조회용 → 주문용)
+_EXCD_MAP = {"NASD": "NAS", "NYSE": "NYS", "AMEX": "AMS"}
+_LOOKUP_EXCDS = tuple(_EXCD_MAP.values())   # 시세 조회용 거래소 코드 전체 (현재가 캐시 키)
+_ORDER_EXCH_MAP = {"NAS": "NASD", "AMS": "AMS", "NYS": "NYSE"}
+# 해외주식(미국) 주문 TR_ID (모의투자 매도는 단순 T→V 치환이 아닌 VTTT1001U)
+_ORDER_TR_IDS = {"BUY": "TTTT1002U", "SELL": "TTTT1006U"}
+_PAPER_ORDER_TR_IDS = {"BUY": "VTTT1002U", "SELL": "VTTT1001U"}
+# 주문 거부 시 순서대로 재시도할 거래소 후보 (나스닥 주문 실패 → AMEX → NYSE)
+_ORDER_FALLBACK_EXCHANGES = {"NASD": ("NASD", "AMS", "NYSE")}
+
+class _PacedRetry(Retry):
+    """
+    [NEW] 재전송도 호출 속도 제한기를 거치는 Retry
+    - urllib3가 429/5xx/타임아웃으로 다시 보내는 요청도 KIS 초당 한도에 포함되므로
+      백오프 대기 후 limiter.acquire()로 차례를 받은 뒤 재전송
+    """
+    def __init__(self, *args, limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.limiter = self.limiter
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.limiter is not None:
+            self.limiter.acquire()
 
 class KisApi:
     """
@@ -25,59 +75,130 @@ class KisApi:
     - 역할: 시세 조회, 잔고 확인, 주문 전송 등 서버와의 모든 통신 담당
     - 안전장치: 네트워크 불안정(Timeout) 시 즉시 포기하지 않고 3회 재시도 수행
     """
+    # [NEW] 단기 캐시 유효시간 (초)
+    PRICE_CACHE_TTL_SEC = 0.5       # 현재가: 같은 틱 안의 중복 조회만 제거 (트레일링 스탑 지연 방지)
+    # [NEW] _fetch_with_retry 단위 응답 메모 (TR_ID별 TTL, 목록에 없는 TR은 캐시 안 함)
+    # - 잔고/미체결/주문 등 계좌 TR은 절대 넣지 말 것 (체결 확인 폴링이 옛 응답을 받게 됨)
+    FETCH_MEMO_TTL_BY_TR = {
+        "HHDFS76200100": 0.5,       # 호가: 진입 직전 main → 주문관리자 연속 조회 중복 제거
+    }
+
     def __init__(self, token_manager):
         self.tm = token_manager
-        self.base_url = Config().BASE_URL
+        self.base_url = Config.BASE_URL
+        # [NEW] 모의투자 서버 여부는 생성 시 1회만 판별 (매 요청마다 문자열 검색 X)
+        self.is_paper = "vts" in self.base_url
         
         # 로거 설정
         self.logger = get_logger("KisApi")
         
-        self.headers = {
+        # [수정] 고정 헤더만 보관 (토큰/TR_ID는 요청마다 새 dict로 조립 -> 공유 상태 변경 X)
+        self._base_headers = MappingProxyType({
             "content-type": "application/json; charset=utf-8",
-            "authorization": "",
-            "appkey": Config().APP_KEY,
+            "appkey": Config.APP_KEY,
             "appsecret": Config.APP_SECRET,
-            "tr_id": "",
             "custtype": "P"
-        }
+        })
+        # [NEW] TR_ID별 완성 헤더 캐시 {tr_id: (token, 읽기 전용 헤더)} - 토큰이 바뀌면 다시 생성
+        self._header_cache = {}
         
+        # [NEW] 프로세스 공용 호출 속도 제한 (페이지/주문마다 고정 sleep 대신 전역 토큰 버킷)
+        # [수정] 조회용/주문용 버킷 분리 -> 분봉 대량 조회가 손절 주문을 막지 않도록 주문 몫을 따로 확보
+        # - 모의투자는 전체 한도(초당 2건)가 너무 작아 나누지 않고 하나를 공유 (0.55초 간격, 몰아 보내기 없음)
+        # - 1초 최대 호출 수 = rate + capacity 이므로 실전은 두 버킷 합계가 한도 20건보다 여유 있게 설정
+        if self.is_paper:
+            self._rate_limiter = self._order_rate_limiter = TokenBucket(1.8, capacity=0)
+        else:
+            self._rate_limiter = TokenBucket(getattr(Config, 'API_CALLS_PER_SEC', 13),
+                                             capacity=getattr(Config, 'API_CALLS_BURST', 1))
+            # 주문 버킷은 연속 3건(NASD→AMS→NYSE 폴백, 취소→매도)을 대기 없이 보낼 수 있도록 capacity=2
+            self._order_rate_limiter = TokenBucket(getattr(Config, 'API_ORDER_CALLS_PER_SEC', 2),
+                                                   capacity=getattr(Config, 'API_ORDER_CALLS_BURST', 2))
+
         # [Smart Retry] 세션 설정 (HTTP 연결 풀링 및 재시도)
         # requests.get을 매번 새로 만드는 것보다 Session을 쓰면 훨씬 빠르고 안정적입니다.
         self.session = requests.Session()
-        retries = Retry(
+        retries = _PacedRetry(
             total=3,                # 최대 3번 재시도
-            backoff_factor=0.3,     # 0.3초, 0.6초, 1.2초... 간격으로 대기
-            status_forcelist=[500, 502, 503, 504], # 서버 에러 시 재시도
-            allowed_methods=["GET"] # GET 요청만 재시도 (주문(POST)은 중복 위험으로 제외)
+            backoff_factor=0.5,     # [수정] 0.3 → 0.5 (지수 백오프 간격 확대)
+            backoff_jitter=0.5,     # [NEW] 0~0.5초 무작위 지연 추가 (동시 요청들의 재시도 시점 분산)
+            backoff_max=5.0,        # [NEW] 재시도 대기 상한 (시세 조회가 과도하게 늘어지지 않도록)
+            status_forcelist=[429, 500, 502, 503, 504], # 서버 에러 + 호출 한도 초과(429) 시 재시도
+            allowed_methods=["GET"], # GET 요청만 재시도 (주문(POST)은 중복 위험으로 제외)
+            respect_retry_after_header=True, # 서버가 Retry-After를 주면 그 시간만큼 대기
+            limiter=self._rate_limiter  # [NEW] 재전송도 조회 버킷에서 차례를 받음 (GET만 재시도되므로 조회 버킷)
         )
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        # [수정] 단일 호스트(KIS) 전용 풀 크기 명시 (기본 10 → 20, 동시 요청 시 소켓 재사용)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,     # 호스트별 풀 개수 (KIS 실전/모의 + 여유)
+            pool_maxsize=20,        # 호스트당 유지할 Keep-Alive 연결 수
+            max_retries=retries
+        ))
+
+        # [NEW] (거래소, 종목) 단위 단기 응답 캐시
+        self._price_cache = TTLCache(self.PRICE_CACHE_TTL_SEC, maxsize=512)
+        self._fetch_memo = TTLCache(0, maxsize=256)
+
+        # [NEW] 주문이 실제로 체결 접수된 거래소 기억 (종목 -> 주문용 거래소 코드)
+        self._order_exch_memo = {}
+
+        # [NEW] 동시 조회용 스레드 풀 (호출마다 생성/종료하지 않고 프로세스 동안 재사용)
+        # - 모의투자는 호출 한도가 낮아 순차 실행 (풀 없음)
+        workers = 1 if self.is_paper else max(1, getattr(Config, 'API_FETCH_WORKERS', 4))
+        self._fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kis-fetch") if workers > 1 else None
+
+    def close(self):
+        """[NEW] 종료 시 스레드 풀과 HTTP 세션 정리"""
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+            self._fetch_pool = None
+        self.session.close()
+
+    def _headers_for(self, tr_id):
+        """
+        [수정] API 호출용 헤더 반환 (토큰 + TR_ID)
+        - 기존 _update_headers는 공유 dict(self.headers)를 덮어써서 동시 호출 시 tr_id가 섞일 위험
+        - [NEW] (토큰, TR_ID)가 같으면 이전에 만든 읽기 전용 헤더를 재사용 (수정 불가 -> 스레드 간 공유 안전)
+        """
+        token = self.tm.get_token()
+        cached = self._header_cache.get(tr_id)
+        if cached is not None and cached[0] == token:
+            return cached[1]
 
-    def _update_headers(self, tr_id):
-        """API 호출 전 토큰과 TR_ID(거래코드)를 헤더에 갱신"""
-        self.headers["authorization"] = f"Bearer {self.tm.get_token()}"
-        self.headers["tr_id"] = tr_id
-        
         # [모의투자 자동 변환 로직]
-        if "vts" in self.base_url and tr_id.startswith("T"):
-            self.headers["tr_id"] = "V" + tr_id[1:]
+        real_tr_id = "V" + tr_id[1:] if self.is_paper and tr_id.startswith("T") else tr_id
+
+        headers = dict(self._base_headers)
+        headers["authorization"] = f"Bearer {token}"
+        headers["tr_id"] = real_tr_id
+        headers = MappingProxyType(headers)
+        self._header_cache[tr_id] = (token, headers)
+        return headers
 
-    def _safe_float(self, val):
+    @staticmethod
+    def _safe_float(val):
         """문자열 숫자를 안전하게 float로 변환"""
+        if not val:
+            return 0.0
+        # [수정] 이미 숫자면 문자열 변환 없이 바로 반환, 쉼표가 있을 때만 replace
+        if isinstance(val, (int, float)):
+            return float(val)
+        if not isinstance(val, str):
+            val = str(val)
+        if "," in val:
+            val = val.replace(",", "")
         try:
-            if not val: return 0.0
-            return float(str(val).replace(",", ""))
-        except Exception:
+            return float(val)
+        except ValueError:
             return 0.0
             
     def _get_lookup_excd(self, exchange):
         """거래소 코드 변환 (NASD -> NAS)"""
-        excd_map = {"NASD": "NAS", "NYSE": "NYS", "AMEX": "AMS"}
-        return excd_map.get(exchange, exchange)
+        return _EXCD_MAP.get(exchange, exchange)
 
     def _get_order_exch(self, exchange):
         """조회 거래소 코드를 주문 거래소 코드로 변환 (NAS->NASD, AMS->AMS, NYS->NYSE)"""
-        order_exch_map = {"NAS": "NASD", "AMS": "AMS", "NYS": "NYSE"}
-        return order_exch_map.get(exchange, "NASD")
+        return _ORDER_EXCH_MAP.get(exchange, "NASD")
 
     # =================================================================
     # 🛠️ [핵심] 스마트 요청 처리기 (Smart Request Handler)
@@ -89,7 +210,16 @@ class KisApi:
         - 타임아웃 발생 시 재시도하며
         - 에러를 우아하게(Graceful) 처리합니다.
         """
-        self._update_headers(tr_id)
+        # [NEW] 짧은 시간 안에 같은 조회가 반복되면 직전 응답 재사용 (GET + 허용된 TR만)
+        memo_ttl = self.FETCH_MEMO_TTL_BY_TR.get(tr_id, 0) if method == "GET" else 0
+        if memo_ttl:
+            memo_key = (path, tr_id, tuple(sorted(params.items())))
+            cached = self._fetch_memo.get(memo_key)
+            if cached is not None:
+                return cached
+
+        self._rate_limiter.acquire()
+        headers = self._headers_for(tr_id)
         url = f"{self.base_url}{path}"
         
         # [NEW] 로깅용 종목코드 자동 추출
@@ -99,16 +229,17 @@ class KisApi:
         try:
             # Session을 사용하여 재시도 로직 적용
             if method == "GET":
-                res = self.session.get(url, headers=self.headers, params=params, timeout=timeout)
+                res = self.session.get(url, headers=headers, params=params, timeout=timeout)
             else:
                 # POST는 재시도 로직을 함부로 쓰면 안 됨 (주문 중복 위험)
-                res = requests.post(url, headers=self.headers, json=params, timeout=timeout)
+                # -> Retry는 GET에만 적용되므로 같은 Session(연결 재사용)으로 보내도 안전
+                res = self.session.post(url, headers=headers, data=_json_dumps(params), timeout=timeout)
             
             # 응답 코드가 200이 아니면 에러 발생
             res.raise_for_status()
             
-            # JSON 파싱
-            data = res.json()
+            # JSON 파싱 (bytes 그대로 파싱 -> 문자열 디코딩 단계 생략)
+            data = _json_loads(res.content)
             
             # KIS API 자체 에러 코드 확인 (rt_cd가 0이 아니면 실패)
             if data.get('rt_cd') != '0':
@@ -117,6 +248,8 @@ class KisApi:
                 self.logger.warning(f"⚠️ API 호출 실패{sym_log} [{tr_id}]: {msg}")
                 return None
                 
+            if memo_ttl:
+                self._fetch_memo.set(memo_key, data, ttl=memo_ttl)
             return data
             
         except requests.exceptions.Timeout:
@@ -125,7 +258,7 @@ class KisApi:
         except requests.exceptions.RequestException as e:
             self.logger.error(f"💥 [Network Error] 통신 실패{sym_log}: {e}")
             return None
-        except json.JSONDecodeError:
+        except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError 공통 부모
             self.logger.error(f"📝 [JSON Error] 응답 데이터 파싱 실패{sym_log}")
             return None
 
@@ -153,8 +286,8 @@ class KisApi:
         return 0.0
 
     @log_api_call("잔고 조회")
-    def get_balance(self):
-        """실시간 잔고 조회 (재시도 로직 적용됨)"""
+    def get_balance(self, timeout=10):
+        """실시간 잔고 조회 (재시도 로직 적용됨, timeout: 요청 1회 타임아웃 초)"""
         path = "/uapi/overseas-stock/v1/trading/inquire-balance"
         params = {
             "CANO": Config.CANO, 
@@ -165,8 +298,8 @@ class KisApi:
             "CTX_AREA_NK200": ""
         }
         
-        # [Smart Retry] 적용 (데이터가 크므로 timeout 10초)
-        data = self._fetch_with_retry(path, params, "TTTS3012R", timeout=10)
+        # [Smart Retry] 적용 (데이터가 크므로 기본 timeout 10초)
+        data = self._fetch_with_retry(path, params, "TTTS3012R", timeout=timeout)
         
         holdings = []
         if data:
@@ -183,20 +316,64 @@ class KisApi:
                     })
         return holdings
 
+    def get_account_snapshot(self):
+        """
+        [NEW] 주문가능금액 + 보유 잔고 동시 조회
+        - 반환: (buyable_cash, holdings) - 각각 get_buyable_cash(), get_balance()와 동일한 형식
+        - 주문가능금액은 미수 방지를 위해 기존대로 TTTS3007R 사용 (잔고 TR의 평가금액으로 대체하지 않음)
+        """
+        cash, holdings = self._map_concurrent(lambda fn: fn(), [self.get_buyable_cash, self.get_balance])
+        return cash, holdings
+
+    def wait_for_fill(self, symbol, min_qty, timeout=1.5, first_delay=0.2, max_delay=1.0, request_timeout=1.0):
+        """
+        [NEW] 매수 체결이 잔고에 반영될 때까지 대기 (지수 백오프 폴링)
+        - 고정 대기(1.5초) 대신 0.2초 → 0.4초 → 0.8초... 간격으로 잔고 확인
+        - 대부분 0.5초 이내 체결되므로 평단가를 더 빨리 확보할 수 있음
+        - [수정] 종목이 보이는 것만으로는 부족함 (부분 체결 / 주문 전부터 보유 중인 종목)
+          -> 보유 수량이 min_qty(주문 전 보유 수량 + 주문 수량) 이상이 되어야 체결 완료로 판단
+        - 잔고 조회 1회 타임아웃은 request_timeout(기본 1초)으로 짧게 제한
+        - 최대 대기: 정상 응답 시 timeout(1.5초) + 조회 1회
+          (통신 장애 시 마지막 조회가 urllib3 재시도 3회 + 백오프까지 겹치면 최악 약 13초)
+        - 반환값: 해당 종목의 잔고 항목(dict) 또는 시간 초과/부분 체결 시 None
+        """
+        deadline = time.monotonic() + timeout
+        delay = first_delay
+
+        while True:
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+
+            for item in self.get_balance(timeout=request_timeout) or []:
+                if item['symbol'] == symbol and item['qty'] >= min_qty:
+                    return item
+
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"⏳ [Fill Wait] {symbol} 체결 반영 대기 시간 초과 ({timeout}초)")
+                return None
+            delay = min(delay * 2, max_delay)
+
     # =================================================================
     # 🔍 [시장 데이터] 랭킹 및 시세 조회
     # =================================================================
 
-    @log_api_call("랭킹 조회(통합)")
     def get_ranking(self):
+        """급등주 랭킹 조회 (종목 리스트만 반환, 등락률 정렬 여부가 필요하면 get_ranking_with_order 사용)"""
+        result = self.get_ranking_with_order()
+        return result[0] if result else []
+
+    @log_api_call("랭킹 조회(통합)")
+    def get_ranking_with_order(self):
         """
         급등주 랭킹 조회 (등락률 상위) — NAS + AMS + NYS 전 거래소 통합
         [수정] EXCD: "NAS" 단일 조회 → 3개 거래소 순차 조회로 변경
         - 배경: AMEX(AMS) 상장 종목(BATL 등)이 NAS 조회에서 누락되는 버그 수정
         - 실전 포착 종목 30개 중 5개(16.7%)가 AMS 종목으로 확인됨 (2026-03-04 검증)
+        - [수정] 반환: (종목 리스트, 등락률 내림차순 정렬 보장 여부)
+          (정렬 여부를 인스턴스 속성으로 남기면 다른 호출이 사이에 덮어쓸 수 있어 응답과 함께 반환)
         """
         path = "/uapi/overseas-stock/v1/ranking/updown-rate"
         all_results = []
+        received_excds = 0
 
         for excd in ["NAS"]:
             params = {
@@ -208,14 +385,16 @@ class KisApi:
                 for item in data['output2']:
                     item['_excd'] = excd  # 디버깅용 거래소 태그
                 all_results.extend(data['output2'])
+                received_excds += 1
                 self.logger.debug(f"[Ranking] {excd}: {len(data['output2'])}개 수신")
 
         if all_results:
+            # 거래소별 응답은 각각 등락률 내림차순이므로, 단일 거래소일 때만 전체 정렬이 보장됨
             self.logger.info(f"[Ranking] 전체 수신: {len(all_results)}개 (NAS+AMS+NYS 통합)")
-            return all_results
+            return all_results, received_excds == 1
 
         self.logger.warning("⚠️ 전 거래소 등락률 랭킹 실패 -> 거래량 순위로 우회 시도")
-        return self._get_volume_ranking()
+        return self._get_volume_ranking(), False  # 거래량 순위는 등락률 정렬이 아님
 
     def _get_volume_ranking(self):
         """[Fallback] 거래량 상위 종목 조회 — NAS + AMS + NYS 통합"""
@@ -243,6 +422,13 @@ class KisApi:
         """실시간 현재가 조회"""
         path = "/uapi/overseas-price/v1/quotations/price-detail"
         lookup_excd = self._get_lookup_excd(exchange) 
+
+        # [NEW] 직전 조회 결과가 유효하면 재사용
+        cache_key = (lookup_excd, symbol)
+        cached = self._price_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         params = {
             "AUTH": "", "EXCD": lookup_excd, "SYMB": symbol
         }
@@ -250,9 +436,20 @@ class KisApi:
         data = self._fetch_with_retry(path, params, "HHDFS76200200", timeout=5)
         
         if data:
-            return self._safe_float(data['output'].get('last', 0))
+            price = self._safe_float(data['output'].get('last', 0))
+            if price > 0:
+                self._price_cache.set(cache_key, price)
+            return price
         return None
 
+    def invalidate_price(self, symbol):
+        """
+        [NEW] 주문 직후 등 최신 시세가 꼭 필요할 때 현재가 캐시 삭제
+        - [수정] 주문 거래소(폴백 포함)와 조회 거래소가 다를 수 있으므로 모든 조회 거래소 키를 삭제
+        """
+        for lookup_excd in _LOOKUP_EXCDS:
+            self._price_cache.invalidate((lookup_excd, symbol))
+
     def get_minute_candles(self, market, symbol, limit=800):
         """
         [수정 완료] 분봉 데이터 연속 조회 (Pagination)
@@ -267,23 +464,27 @@ class KisApi:
         
         all_data = []
         next_key = ""  # 초기값 공백
+        total = 0                # [수정] 누적 개수 (매 페이지 len() 재계산 대신 누적)
+        last_saved_korea = ""    # [수정] 직전 페이지 마지막 봉의 한국시간 키 (중복 체크용)
+        
+        # [수정] 고정 파라미터는 루프 밖에서 1회 생성, 페이지마다 NEXT/KEYB만 갱신
+        params = {
+            "AUTH": "", 
+            "EXCD": lookup_excd, 
+            "SYMB": symbol,
+            "NMIN": "1", 
+            "PINC": "1", 
+            "NEXT": "", 
+            "NREC": "120", 
+            "FILL": "",
+            "KEYB": ""
+        }
         
         # [Loop] 목표 개수를 채우거나 더 이상 데이터가 없을 때까지 반복
-        while len(all_data) < limit:
+        while total < limit:
             # 첫 요청은 NEXT="", 이후 요청부터는 NEXT="1"
-            is_next = "1" if next_key else ""
-            
-            params = {
-                "AUTH": "", 
-                "EXCD": lookup_excd, 
-                "SYMB": symbol,
-                "NMIN": "1", 
-                "PINC": "1", 
-                "NEXT": is_next, 
-                "NREC": "120", 
-                "FILL": "",
-                "KEYB": next_key  # 현지 시간 기준 키값
-            }
+            params["NEXT"] = "1" if next_key else ""
+            params["KEYB"] = next_key  # 현지 시간 기준 키값
             
             # API 호출
             data = self._fetch_with_retry(path, params, "HHDFS76950200", timeout=3)
@@ -298,9 +499,8 @@ class KisApi:
             # -----------------------------------------------------------
             # 🛡️ 무한 루프 방지 (중복 데이터 체크)
             # -----------------------------------------------------------
-            if all_data:
+            if last_saved_korea:
                 # [기존 데이터 끝] vs [새 데이터 시작] 시간 비교
-                last_saved_korea = all_data[-1]['kymd'] + all_data[-1]['khms']
                 first_new_korea = chunk[0]['kymd'] + chunk[0]['khms']
                 
                 # 주의: 경계선 데이터는 시간이 같을 수 있음 (>= 가 아니라 > 로 비교해야 함)
@@ -311,9 +511,11 @@ class KisApi:
             # -----------------------------------------------------------
              
             all_data.extend(chunk)
+            total += len(chunk)
+            last_saved_korea = chunk[-1]['kymd'] + chunk[-1]['khms']
             
             # 목표 개수 충족 시 조기 종료
-            if len(all_data) >= limit:
+            if total >= limit:
                 break
             
             # 데이터가 120개 미만이면 더 이상 과거 데이터가 없는 것
@@ -330,36 +532,82 @@ class KisApi:
             else:
                 # 비상시 한국 시간 (데이터 없을 경우 대비)
                 next_key = last_item['kymd'] + last_item['khms']
-            
-            time.sleep(0.55) # [수정] 초당 2건 제한 준수 (API 부하 방지)
+            # [수정] 페이지 간 고정 sleep(0.55) 제거 -> _fetch_with_retry의 전역 토큰 버킷이 호출 간격 조절
             
         # 데이터프레임 변환
         if not all_data:
             return pd.DataFrame()
 
-        df = pd.DataFrame(all_data)
-        
-        # 컬럼명 통일
-        df = df.rename(columns={
-            'xymd': 'date', 'xhms': 'time',   # [FIX] KST(kymd/khms) → 현지 ET(xymd/xhms)
-            'open': 'open', 'high': 'high', 'low': 'low', 
-            'last': 'close', 'vols': 'volume', 'evol': 'volume'
+        # [수정] API 응답은 [최신 -> 과거] 순서이므로, 리스트 단계에서 최신 limit개만 남기고 뒤집음
+        # (DataFrame 역순 복사 + limit 슬라이스 복사 2회 → 포인터 리스트 조작 1회)
+        del all_data[limit:]
+        all_data.reverse()
+
+        # [수정] 필요한 필드만 컬럼 단위 리스트로 뽑아 생성 (dict 리스트 → 전체 컬럼 추론 + rename 과정 생략)
+        # API 필드명 -> 내부 사용 컬럼명 ([FIX] 날짜/시간은 KST(kymd/khms) 아닌 현지 ET(xymd/xhms))
+        df = pd.DataFrame({
+            'date': [r.get('xymd', '') for r in all_data],
+            'time': [r.get('xhms', '') for r in all_data],
+            'open': [r.get('open', '') for r in all_data],
+            'high': [r.get('high', '') for r in all_data],
+            'low': [r.get('low', '') for r in all_data],
+            'close': [r.get('last', '') for r in all_data],
+            'volume': [r.get('evol', '') for r in all_data],
         })
         
         # 숫자 형변환
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
-                df[col] = df[col].apply(self._safe_float)
-        
-        # 정렬: [과거 -> 최신] 순서로 변경
-        df = df.iloc[::-1].reset_index(drop=True)
+        # [수정] 셀마다 _safe_float 호출 대신 컬럼 단위 벡터 변환 (쉼표 제거 → 변환 실패/빈 값은 0.0)
+        num_cols = ['open', 'high', 'low', 'close', 'volume']
+        df[num_cols] = df[num_cols].apply(
+            lambda s: pd.to_numeric(s.astype(str).str.replace(",", "", regex=False), errors="coerce")
+        ).fillna(0.0).astype("float64")
         
-        # 요청한 limit만큼 자르기 (최신순 유지)
-        if len(df) > limit:
-            df = df.iloc[-limit:].reset_index(drop=True)
-            
         return df
 
+    def _map_concurrent(self, func, items):
+        """
+        [NEW] 조회 함수를 여러 입력에 동시 적용 (스레드 풀, 입력 순서대로 결과 반환)
+        - 호출 속도는 _rate_limiter가 전역으로 제한하므로 스레드 수는 동시 대기 RTT 수만 결정
+        - 모의투자(풀 없음)이거나 입력이 1개 이하면 순차 실행
+        - 주의: func 안에서 다시 _map_concurrent를 호출하지 말 것 (공용 풀 고갈로 교착 가능)
+        """
+        items = list(items)
+        pool = self._fetch_pool
+        if pool is None or len(items) <= 1:
+            return list(map(func, items))
+        return list(pool.map(func, items))
+
+    def get_minute_candles_many(self, jobs, limit=120):
+        """
+        [NEW] 여러 종목 분봉 동시 조회
+        - jobs: [(market, symbol), ...]
+        - 반환: {symbol: DataFrame} (실패 종목은 빈 DataFrame)
+        - 종목 내부 페이지네이션은 순차, 종목끼리만 병렬
+        """
+        def _fetch(job):
+            market, symbol = job
+            try:
+                return symbol, self.get_minute_candles(market, symbol, limit=limit)
+            except Exception as e:
+                self.logger.error(f"❌ 분봉 동시 조회 실패 ({symbol}): {e}")
+                return symbol, pd.DataFrame()
+
+        return dict(self._map_concurrent(_fetch, jobs))
+
+    def get_current_prices(self, symbols, exchange="NAS"):
+        """
+        [NEW] 여러 종목 현재가 동시 조회
+        - 반환: {symbol: price 또는 None}
+        """
+        def _fetch(symbol):
+            try:
+                return symbol, self.get_current_price(symbol, exchange=exchange)
+            except Exception as e:
+                self.logger.error(f"❌ 현재가 동시 조회 실패 ({symbol}): {e}")
+                return symbol, None
+
+        return dict(self._map_concurrent(_fetch, symbols))
+
     # =================================================================
     # 🔫 [주문 관련] 매수/매도 실행 (수정됨)
     # =================================================================
@@ -380,50 +628,67 @@ class KisApi:
         return self.place_order_final("NASD", symbol, "BUY", qty, agressive_price, ord_dvsn="00")
         
 
+    @staticmethod
+    def _format_price(price):
+        """
+        [NEW] 주문 단가 문자열 변환 ($1 미만 소수점 4자리, 이상 2자리)
+        - 0/None이면 시장가(혹은 가격무관)로 간주하여 "0"
+        - 숫자가 아닌 값은 예외를 그대로 올려 잘못된 단가로 주문이 나가지 않게 함
+        """
+        if not price:
+            return "0"
+        price = float(price)
+        return f"{price:.4f}" if price < 1.0 else f"{price:.2f}"
+
     @log_api_call("주문 전송")
     def place_order_final(self, exchange, symbol, side, qty, price, ord_dvsn="00"):
         """
         [수정] ord_dvsn 파라미터 추가 (기본값 "00": 지정가)
         """
         path = "/uapi/overseas-stock/v1/trading/order"
-        is_buy = (side == "BUY")
-        tr_id = "TTTT1002U" if is_buy else "TTTT1006U"
+        tr_id = (_PAPER_ORDER_TR_IDS if self.is_paper else _ORDER_TR_IDS)["BUY" if side == "BUY" else "SELL"]
 
         # 가격 포맷팅
-        try:
-            f_price = float(price)
-            # 0원이면 시장가(혹은 가격무관)로 간주
-            final_price = f"{f_price:.4f}" if f_price < 1.0 else f"{f_price:.2f}"
-            if f_price == 0: final_price = "0"
-        except:
-            final_price = "0"
-
-        exchange_candidates = [exchange]
-        if exchange == "NASD":
-            exchange_candidates.extend(["AMS", "NYSE"]) 
+        final_price = self._format_price(price)
+
+        exchange_candidates = _ORDER_FALLBACK_EXCHANGES.get(exchange, (exchange,))
+        # [NEW] 이전에 접수 성공한 거래소가 후보에 있으면 맨 앞으로 (거래소 오판 시 왕복 낭비 제거)
+        known_exch = self._order_exch_memo.get(symbol)
+        if known_exch in exchange_candidates and known_exch != exchange_candidates[0]:
+            exchange_candidates = (known_exch,) + tuple(e for e in exchange_candidates if e != known_exch)
         
         last_error_msg = ""
 
+        # [수정] 헤더/본문/URL은 거래소 후보 루프 밖에서 1회만 생성 (루프에서는 거래소 코드만 교체)
+        url = f"{self.base_url}{path}"
+        headers = self._headers_for(tr_id)
+        body = {
+            "CANO": Config.CANO, 
+            "ACNT_PRDT_CD": Config.ACNT_PRDT_CD,
+            "OVRS_EXCG_CD": "", 
+            "PDNO": symbol, 
+            "ORD_QTY": str(int(qty)),  
+            "OVRS_ORD_UNPR": final_price, 
+            "ORD_SVR_DVSN_CD": "0", 
+            # [수정] 하드코딩된 "00" 대신 파라미터 사용
+            "ORD_DVSN": ord_dvsn 
+        }
+
         for try_exch in exchange_candidates:
-            self._update_headers(tr_id)
-            body = {
-                "CANO": Config.CANO, 
-                "ACNT_PRDT_CD": Config.ACNT_PRDT_CD,
-                "OVRS_EXCG_CD": try_exch, 
-                "PDNO": symbol, 
-                "ORD_QTY": str(int(qty)),  
-                "OVRS_ORD_UNPR": final_price, 
-                "ORD_SVR_DVSN_CD": "0", 
-                # [수정] 하드코딩된 "00" 대신 파라미터 사용
-                "ORD_DVSN": ord_dvsn 
-            }
+            self._order_rate_limiter.acquire()
+            body["OVRS_EXCG_CD"] = try_exch
             
             try:
-                res = requests.post(f"{self.base_url}{path}", headers=self.headers, json=body, timeout=10)
-                data = res.json()
+                # [수정] 세션 재사용 (Keep-Alive로 주문마다 TCP/TLS 핸드셰이크 생략)
+                # - 마운트된 Retry는 GET 전용이므로 주문(POST)은 재전송되지 않음 (중복 주문 방지)
+                res = self.session.post(url, headers=headers, data=_json_dumps(body), timeout=10)
+                data = _json_loads(res.content)
                 
                 if data['rt_cd'] == '0':
                     odno = data['output'].get('ODNO')
+                    self._order_exch_memo[symbol] = try_exch
+                    # [NEW] 체결로 시세가 움직였을 수 있으므로 다음 현재가 조회는 캐시 없이 새로 받음
+                    self.invalidate_price(symbol)
                     self.logger.info(f"✅ 주문 성공 ({try_exch}) [{side}] {symbol} {qty}주 #{odno}")
                     return odno
                 else:
@@ -435,8 +700,6 @@ class KisApi:
             except Exception as e: 
                 self.logger.error(f"❌ 주문 통신 에러 ({try_exch}): {e}")
                 last_error_msg = str(e)
-            
-            time.sleep(0.2)
 
         self.logger.error(f"❌ 최종 주문 실패 ({symbol}): {last_error_msg}")
         return None
@@ -497,6 +760,7 @@ class KisApi:
         """
         path = "/uapi/overseas-price/v1/quotations/dailyprice"
         lookup_excd = self._get_lookup_excd(exchange)  # [수정] 동적 처리
+
         params = {
             "AUTH": "", 
             "EXCD": lookup_excd,  # [수정] 하드코딩 "NAS" → 동적 처리
@@ -561,8 +825,9 @@ class KisApi:
         """
         path = "/uapi/overseas-stock/v1/trading/inquire-nccs"
         pending_map = {}
+        exchanges = ["NASD", "NYSE", "AMS"]
 
-        for exchange in ["NASD", "NYSE", "AMS"]:
+        def _fetch(exchange):
             params = {
                 "CANO": Config.CANO,
                 "ACNT_PRDT_CD": Config.ACNT_PRDT_CD,
@@ -571,9 +836,10 @@ class KisApi:
                 "CTX_AREA_FK200": "",
                 "CTX_AREA_NK200": ""
             }
+            return self._fetch_with_retry(path, params, "TTTS3018R", timeout=3)
 
-            # 미체결 내역 조회
-            data = self._fetch_with_retry(path, params, "TTTS3018R", timeout=3)
+        # [수정] 거래소 3곳 미체결 내역을 동시에 조회 (순차 3회 왕복 → 1회 왕복 수준)
+        for exchange, data in zip(exchanges, self._map_concurrent(_fetch, exchanges)):
             if not data or not data.get('output'):
                 continue
 
@@ -623,7 +889,7 @@ class KisApi:
         tr_id = "HHDFS76950200" 
 
         # [요청 헤더 준비]
-        headers = self._get_header(tr_id)
+        headers = self._headers_for(tr_id)
 
         # [요청 파라미터 준비]
         lookup_excd = self._get_lookup_excd(exchange)
@@ -641,7 +907,9 @@ class KisApi:
 
         # API 호출
         try:
-            res = requests.get(
+            self._rate_limiter.acquire()
+            # [수정] 공용 Session 사용 (Keep-Alive로 TLS 핸드셰이크 재사용)
+            res = self.session.get(
                 url=f"{self.base_url}{path}",
                 headers=headers,
                 params=params,
@@ -652,7 +920,7 @@ class KisApi:
                 self.logger.error(f"분봉 조회 실패({ticker}): {res.text}")
                 return pd.DataFrame()
 
-            data = res.json()
+            data = _json_loads(res.content)
             
             # 응답 코드가 성공이 아니면 빈 DF 반환
             if data['rt_cd'] != '0': 
@@ -662,23 +930,28 @@ class KisApi:
                 # [공식 문서 필드명 매핑]
                 # tymd: 현지영업일자, xhms: 현지기준시간
                 # open: 시가, high: 고가, low: 저가, last: 종가, evol: 체결량
-                df = pd.DataFrame(data['output2'])
-                
-                # 필요한 컬럼만 추출 및 이름 변경
+                # [수정] 필요한 필드만 숫자로 변환하며 한 번에 생성
+                # (전체 DataFrame 생성 → 컬럼 추출 → 이름 변경 → 형변환 복사 과정 생략)
                 # API 필드명 -> 내부 사용 변수명
-                df = df[['tymd', 'xhms', 'open', 'high', 'low', 'last', 'evol']]
-                df.columns = ['date', 'time', 'open', 'high', 'low', 'close', 'volume']
-                
-                # 데이터 타입 변환 (문자열 -> 숫자)
-                cols = ['open', 'high', 'low', 'close', 'volume']
-                df[cols] = df[cols].apply(pd.to_numeric)
+                rows = [
+                    (r['tymd'], r['xhms'],
+                     float(r['open']), float(r['high']), float(r['low']),
+                     float(r['last']), float(r['evol']))
+                    for r in data['output2']
+                ]
+                # 시간 역순(최신이 0번)으로 들어오므로, 과거->현재 순으로 뒤집음
+                rows.reverse()
+                df = pd.DataFrame.from_records(
+                    rows, columns=['date', 'time', 'open', 'high', 'low', 'close', 'volume']
+                )
                 
-                # 날짜와 시간을 합쳐서 datetime 객체 생성 (정렬을 위해)
+                # 날짜와 시간을 합쳐서 datetime 객체 생성
                 # 예: date='20240222', time='160000' -> '2024-02-22 16:00:00'
                 df['datetime'] = pd.to_datetime(df['date'] + df['time'], format='%Y%m%d%H%M%S')
                 
-                # 시간 역순(최신이 0번)으로 들어오므로, 과거->현재 순으로 정렬
-                df = df.sort_values('datetime').reset_index(drop=True)
+                # [수정] 뒤집은 결과가 이미 오름차순이면 정렬 생략 (O(N) 확인, 순서가 어긋난 경우에만 정렬)
+                if not df['datetime'].is_monotonic_increasing:
+                    df = df.sort_values('datetime', kind='stable').reset_index(drop=True)
                 
                 return df
                 
@@ -688,24 +961,6 @@ class KisApi:
             self.logger.error(f"get_recent_candles 예외 발생: {e}")
             return pd.DataFrame()
         
-    def _get_header(self, tr_id=None):
-        """API 요청용 헤더 생성 헬퍼 (수정 완료)"""
-        if tr_id is None:
-            raise ValueError("API 요청 시 tr_id는 필수입니다.")
-            
-        # [수정 포인트]
-        # 1. self.token_manager -> self.tm (변수명 일치)
-        # 2. get_access_token() -> get_token() (메서드명 일치)
-        # 3. self.tm.APP_KEY -> Config.APP_KEY (Config 객체 직접 참조로 안전성 확보)
-        
-        return {
-            "content-type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {self.tm.get_token()}",
-            "appkey": Config.APP_KEY,
-            "appsecret": Config.APP_SECRET,
-            "tr_id": tr_id
-        }
-    
     def cancel_order(self, ticker, order_id, qty=0, exchange="NASD"):
         """
         [주문 취소] 거래소 정보를 인자로 받아 유동적으로 처리
@@ -713,17 +968,8 @@ class KisApi:
         path = "/uapi/overseas-stock/v1/trading/order-rvsecncl"
         tr_id = "TTTT1004U" 
 
-        token = self.tm.get_token()
-        if not token.startswith("Bearer"):
-            token = f"Bearer {token}"
-
-        headers = {
-            "content-type": "application/json; charset=utf-8",
-            "authorization": token,
-            "appkey": Config.APP_KEY,
-            "appsecret": Config.APP_SECRET,
-            "tr_id": tr_id
-        }
+        # [수정] 공통 헤더 생성 함수 사용 (모의투자 TR_ID 변환 포함)
+        headers = self._headers_for(tr_id)
 
         # [수정] 인자로 받은 exchange 사용 (기본값 NASD)
         params = {
@@ -739,13 +985,14 @@ class KisApi:
         }
 
         try:
-            res = requests.post(
+            self._order_rate_limiter.acquire()
+            res = self.session.post(
                 url=f"{self.base_url}{path}",
                 headers=headers,
-                data=json.dumps(params),
+                data=_json_dumps(params),
                 timeout=5
             )
-            return res.json()
+            return _json_loads(res.content)
         except Exception as e:
             self.logger.error(f"주문 취소 실패: {e}")
 
@@ -47,7 +47,7 @@ class KisAuth:
 
     def _issue_new_token(self):
         """REST API를 통해 신규 토큰 발급"""
-        url = f"{Config().BASE_URL}/oauth2/tokenP"
+        url = f"{Config.BASE_URL}/oauth2/tokenP"
         headers = {"content-type": "application/json"}
         body = {
             "grant_type": "client_credentials",
@@ -48,13 +48,11 @@ class RealPortfolio:
         API 잔고를 가져오되, 로컬의 중요 정보(highest_price)는 보존하는 병합 로직
         """
         try:
-            # 1. 자산(예수금) 조회
+            # 1. 자산(예수금) + 2. 보유 종목 API 동시 조회
             # TTTS3007R (주문 가능 금액) 사용 -> 미수 발생 방지
-            buying_power = self.kis.get_buyable_cash()
+            # [수정] 두 조회를 동시에 보내 동기화 1회당 왕복 1번 수준으로 단축
+            buying_power, holdings = self.kis.get_account_snapshot() # (float, List[Dict])
             self.balance = float(buying_power)
-
-            # 2. 보유 종목 API 조회
-            holdings = self.kis.get_balance() # List[Dict] 반환
             
             # API에서 확인된 종목 코드 집합 (동기화 비교용)
             api_tickers = set()
@@ -321,6 +319,30 @@ class RealPortfolio:
                 self.logger.info(f"💰 [Sync] 잔고 갱신 완료: ${old_balance:.2f} -> ${self.balance:.2f}")
         except Exception as e:
             self.logger.error(f"❌ 잔고 동기화 실패: {e}")
+
+    # [NEW] 매수 체결 확인(wait_for_fill) 결과를 그대로 반영 -> 전체 재동기화(잔고 조회 재호출) 생략
+    def apply_fill(self, item):
+        """
+        get_balance() 형식의 잔고 항목 1건으로 해당 종목의 수량/평단가만 갱신
+        - 진입 시간, 고가 등 로컬 정보는 유지 (주문 직후 update_position으로 이미 생성된 포지션 기준)
+        - 포지션이 없으면 아무것도 하지 않음 (다음 sync_with_kis에서 정리)
+        """
+        ticker = item['symbol']
+        position = self.positions.get(ticker)
+        if not position:
+            return
+
+        qty = int(float(item['qty']))
+        entry_price = float(item.get('price', 0.0))
+        if qty <= 0 or entry_price <= 0:
+            return
+
+        position.update({
+            'qty': qty,
+            'entry_price': entry_price,
+            'eval_value': position.get('current_price', entry_price) * qty
+        })
+        self.logger.info(f"✅ [Fill] {ticker} 체결 확인: {qty}주 @ ${entry_price:.4f}")
     
     def _log_status(self):
         """현재 상태 로그 출력 (디버깅용)"""
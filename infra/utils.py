@@ -4,6 +4,8 @@ import sys
 import datetime
 import pytz
 import functools
+import threading
+import time
 from logging.handlers import RotatingFileHandler
 
 # 로거 설정 (Singleton)
@@ -55,6 +57,76 @@ def log_api_call(api_name):
         return wrapper
     return decorator
 
+# [NEW] 초단기 응답 캐시 (동일 시세를 짧은 시간 안에 중복 조회하는 것 방지)
+class TTLCache:
+    """
+    키별 만료시간(TTL)을 가진 소형 메모리 캐시 (스레드 안전)
+    - get(key): 만료 전이면 값, 아니면 None
+    - set(key, value, ttl=None): ttl 미지정 시 기본 TTL 사용
+    - maxsize 초과 시 가장 오래 저장된 항목부터 제거
+    """
+    def __init__(self, ttl, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            value, expires_at = hit
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def invalidate(self, key=None):
+        """key 지정 시 해당 항목만, 미지정 시 전체 삭제"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+# [NEW] 프로세스 공용 API 호출 속도 제한기 (호출부마다 고정 sleep 대신 전역 예산으로 관리)
+class TokenBucket:
+    """
+    호출 속도 제한기 (스레드 안전, 호출 예정 시각 기반 토큰 버킷)
+    - rate: 초당 허용 호출 수 (호출 간 기본 간격 = 1/rate초)
+    - capacity: 기본 간격을 무시하고 추가로 몰아 보낼 수 있는 호출 수 (기본값 0 = 항상 1/rate초 간격)
+      (쉬고 있던 버킷은 capacity + 1건을 즉시 통과시킴)
+    - acquire(): 자기 차례가 올 때까지 대기 (대기는 락 밖에서 수행)
+    - 임의의 1초 동안 최대 호출 수 ≤ rate + capacity (소수 rate는 올림) -> 한도 계산 시 둘을 합산할 것
+    """
+    def __init__(self, rate, capacity=0):
+        self.rate = float(rate)
+        self.capacity = max(0, int(capacity))
+        self._interval = 1.0 / self.rate
+        self._next_at = time.monotonic()   # 다음 호출의 기본 예정 시각
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(self._next_at, now)
+            # 예정 시각을 먼저 예약해 두고, capacity만큼 앞당겨도 아직 이르면 그 차이만큼 밖에서 대기
+            self._next_at = scheduled + self._interval
+            wait = scheduled - self.capacity * self._interval - now
+        if wait > 0:
+            time.sleep(wait)
+
 def get_us_time():
     """
     [DEPRECATED] 현재 미국 동부 시간(EST/EDT) 반환 (서머타임 자동 적용)
@@ -274,8 +274,11 @@ def main():
             # 신규 매수를 위한 분봉 완성 대기(55초 수면)와 무관하게, 보유 종목은 매 초마다 
             # 가장 가벼운 현재가 API 1번만 호출하여 손절선을 터치하는 즉시 탈출합니다.
             if portfolio.positions:
-                for ticker in list(portfolio.positions.keys()):
-                    real_time_price = kis.get_current_price(ticker, exchange="NAS")
+                # [수정] 보유 종목 현재가를 한 번에 동시 조회 (종목별 순차 RTT 제거)
+                holding_prices = kis.get_current_prices(list(portfolio.positions.keys()), exchange="NAS")
+                for ticker, real_time_price in holding_prices.items():
+                    if ticker not in portfolio.positions:
+                        continue  # 앞 종목 처리 중 청산/정리된 경우
                     
                     if real_time_price and real_time_price > 0:
                         pos = portfolio.positions[ticker]
@@ -291,9 +294,7 @@ def main():
                                 if result:
                                     bot.send_message(result['msg'])
                                     save_state(portfolio.ban_list, active_candidates)
-                    
-                    # API 초당 2건 제한 준수 (종목당 0.5초 대기)
-                    time.sleep(0.5)
+                # [수정] 종목당 0.5초 고정 대기 제거 (API 호출 간격은 KisApi 토큰 버킷이 조절)
 
             # =========================================================
             # 🕒 [Time Sync] 캔들 완성형 (00초~05초 진입) - 신규 매수 전용
@@ -545,6 +546,12 @@ def main():
             targets_to_check = buy_candidates[:15]
             listener.current_watchlist = targets_to_check 
 
+            # [NEW] 이미 거래소를 아는 종목은 최신 120봉을 한 번에 동시 조회 (종목별 순차 RTT 제거)
+            prefetched_candles = kis.get_minute_candles_many(
+                [(candle_cache[s]['exch'], s) for s in targets_to_check if s in candle_cache],
+                limit=120
+            )
+
             for sym in targets_to_check:
                 # -----------------------------------------------------
                 # 🕒 [Time Cut] 60분 경과 시 감시 해제 (좀비 방지)
@@ -589,7 +596,9 @@ def main():
                         exch = cached_data['exch']
                         selected_exchange = exch
                         
-                        new_df = kis.get_minute_candles(exch, sym, limit=120)
+                        new_df = prefetched_candles.get(sym)
+                        if new_df is None:
+                            new_df = kis.get_minute_candles(exch, sym, limit=120)
                         
                         if not new_df.empty:
                             # 파이썬 메모리에서 0.01초 만에 위아래로 병합
@@ -651,6 +660,8 @@ def main():
                             # ⚡ [Execution] 주문 집행
                             # =========================================================
                             if portfolio.has_open_slot():
+                                # 체결 확인용: 주문 전 보유 수량 (이미 보유 중인 종목 추가 매수 대비)
+                                prev_qty = (portfolio.get_position(sym) or {}).get('qty', 0)
                                 result = order_manager.execute_buy(portfolio, signal)
                                 
                                 if result:
@@ -665,11 +676,17 @@ def main():
                                         # 💡 [핵심 수정] 실제 체결가 확인 후 익절 주문
                                         # ==========================================
                                         
-                                        # 1. 증권사 서버에 체결 내역이 반영될 때까지 1.5초 대기
-                                        time.sleep(1.5) 
+                                        # 1. 증권사 서버에 체결 내역이 반영될 때까지 대기 (백오프 폴링, 최대 1.5초)
+                                        #    (주문 전 수량 + 주문 수량이 잔고에 보여야 체결 완료)
+                                        fill = kis.wait_for_fill(sym, prev_qty + result.get('qty', 0), timeout=1.5)
                                         
-                                        # 2. 잔고를 동기화하여 '진짜 체결 평단가'를 가져옴
-                                        portfolio.sync_with_kis() 
+                                        # 2. '진짜 체결 평단가' 반영
+                                        #    - 체결 확인 시: 방금 받은 잔고 항목을 그대로 사용 (잔고 재조회 생략)
+                                        #    - 미확인(지연/부분 체결) 시: 기존처럼 전체 동기화
+                                        if fill:
+                                            portfolio.apply_fill(fill)
+                                        else:
+                                            portfolio.sync_with_kis()
                                         
                                         try:
                                             # 3. 동기화된 포트폴리오에서 실제 평단가 추출
@@ -713,8 +730,7 @@ def main():
                             candle_cache.pop(sym, None) # 👈 신규 추가 (추세 붕괴하면 더 이상 분봉 감시 안함)
                             save_state(portfolio.ban_list, active_candidates)
 
-                    # [Rate Limit] API 호출 간격 조절 (초당 2건 제한 준수)
-                    time.sleep(0.55)
+                    # [수정] 종목별 고정 대기(0.55초) 제거 -> 호출 간격은 KisApi 공용 속도 제한기가 관리
 
                 except Exception as e:
                     logger.error(f"❌ 매수 로직 에러({sym}): {e}")
@@ -739,6 +755,7 @@ def main():
             save_state(portfolio.ban_list, active_candidates)
             run_live_candle_export(current_date_str, reason="manual_shutdown")
             send_spread_analysis_log(current_date_str)
+            kis.close()
             break
             
         except Exception as e:
@@ -108,7 +108,7 @@ def _manual_order(kis, symbol, qty, price, label):
     import json
     
     path = "/uapi/overseas-stock/v1/trading/order"
-    kis._update_headers("TTTT1006U") # 매도 TR
+    headers = kis._headers_for("TTTT1006U") # 매도 TR
 
     # 가격 포맷팅 (소수점 처리 로직 검증)
     if price < 1.0:
@@ -132,7 +132,7 @@ def _manual_order(kis, symbol, qty, price, label):
     print(f"   📦 JSON Body: {json.dumps(data)}")
 
     try:
-        res = requests.post(f"{kis.base_url}{path}", headers=kis.headers, data=json.dumps(data))
+        res = requests.post(f"{kis.base_url}{path}", headers=headers, data=json.dumps(data))
         resp_json = res.json()
         
         print(f"   📥 응답 코드: {resp_json.get('rt_cd')}")